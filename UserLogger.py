@@ -11,6 +11,7 @@ Main Components:
     - Authentication Logging: Login, registration, and logout events
     - Session Logging: Start and end of learning sessions
     - Activity Logging: Question answers, profile views, and feedback submissions
+    - Batching: Group several log entries into a single database transaction
 
 Database:
     - Table: UserLogs
@@ -21,10 +22,19 @@ Date: February 2025
 """
 
 import json
+import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from flask import session
 from db_utils import get_db_connection
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, Union, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows collected by an open UserLogger.batch() block, kept per thread so a
+# batch never shares a database connection across threads.
+_batch_state = threading.local()
 
 
 class UserLogger:
@@ -41,18 +51,52 @@ class UserLogger:
             if isinstance(action_data, dict):
                 action_data = json.dumps(action_data)
 
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO UserLogs (user_id, action_type, action_data)
-                    VALUES (?, ?, ?)
-                """, (user_id, action_type, action_data))
-                conn.commit()
+            row = (user_id, action_type, action_data)
+            pending = getattr(_batch_state, 'rows', None)
+            if pending is not None:
+                pending.append(row)
+                return
+
+            UserLogger._insert_rows([row])
 
         except Exception as e:
-            print(f"Logging error: {str(e)}")
+            logger.warning("Logging error: %s", e)
             # Don't raise the exception - logging should never break the main application flow
 
+    @staticmethod
+    def _insert_rows(rows: List[Tuple[Any, str, str]]) -> None:
+        """Insert log rows using one connection and a single commit."""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Send all rows in one parameter array instead of one round trip each
+            cursor.fast_executemany = True
+            cursor.executemany("""
+                INSERT INTO UserLogs (user_id, action_type, action_data)
+                VALUES (?, ?, ?)
+            """, rows)
+            conn.commit()
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """Defer every log entry written inside the block and insert them all in
+        one transaction on exit. Nested batches fold into the outermost one."""
+        if getattr(_batch_state, 'rows', None) is not None:
+            yield UserLogger
+            return
+
+        _batch_state.rows = []
+        try:
+            yield UserLogger
+        finally:
+            rows = _batch_state.rows
+            _batch_state.rows = None
+            if rows:
+                try:
+                    UserLogger._insert_rows(rows)
+                except Exception as e:
+                    logger.warning("Logging error: %s", e)
+
     @staticmethod
     def log_login(success: bool, email: str, error_message: Optional[str] = None) -> None:
         """Log user login attempts, successful or failed."""
@@ -129,26 +173,3 @@ class UserLogger:
             "action": "FEEDBACK_SUBMISSION"
         }
         UserLogger.log_action('FEEDBACK_SUBMISSION', data)
-
-
-
-from flask import Blueprint, render_template, request, redirect
-from auth_config import login_user  # כאן אנחנו מייבאים את הפונקציה
-
-login_page = Blueprint('login_page', __name__, template_folder='templates')
-
-@login_page.route("/", methods=["GET", "POST"])
-def login():
-    if request.method == "POST":
-        email = request.form.get("email")
-        password = request.form.get("password")
-
-        # <<< כאן בדיוק צריך לקרוא ל-login_user >>>
-        if login_user(email, password):
-            # התחברות נכונה → שמירת session והפניה לדף פרופיל
-            return redirect("/profile")
-        else:
-            # התחברות נכשלת → מציג הודעת שגיאה
-            return render_template("login.html", error="Email or password incorrect")
-
-    return render_template("login.html")
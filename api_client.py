@@ -21,6 +21,7 @@ from typing import Dict, List, Optional, Any, Union, Tuple
 from flask import session as flask_session
 import logging
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from functools import lru_cache
 from datetime import datetime, timedelta
 from requests.adapters import HTTPAdapter
@@ -67,6 +68,29 @@ class SimpleCache:
 # Global cache instance
 _cache = SimpleCache()
 
+# Connection pool shared by every thread-local session. The API lives on a
+# single host, so one adapter lets all Flask worker threads reuse the same
+# keep-alive sockets instead of handshaking per request. urllib3 pools are
+# thread-safe. Sessions stay per-thread because each one's cookie jar holds
+# the API session cookie for the request that thread is serving; submit()
+# lends that session to pool workers so their calls carry the same cookie.
+_ADAPTER = HTTPAdapter(
+    pool_connections=32,  # Number of connection pools
+    pool_maxsize=64,  # Max connections per pool
+    max_retries=Retry(
+        total=2,  # Reduced retries for faster failure
+        backoff_factor=0.1,  # Quick exponential backoff
+        status_forcelist=[502, 503, 504],  # Retry only on gateway/availability errors
+        # Default allowed_methods: status/read retries are idempotent-only, so a
+        # slow /answers/submit or /session/start is never replayed. Connect
+        # errors are still retried for POST (the request never left the client).
+    ),
+    pool_block=False  # Don't block when pool is full
+)
+
+# Worker pool for overlapping independent API calls within one UI request
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='api-client')
+
 class APIClient:
     """
     Centralized client for interacting with the Geometry Learning System API.
@@ -74,11 +98,12 @@ class APIClient:
     Uses thread-local storage to ensure thread-safety with SQLite-based API.
     
     Performance Optimizations:
-    - Connection pooling for faster requests
+    - Connection pooling shared across all threads
     - Automatic retries with exponential backoff
     - Caching for static data (theorems, answer options, etc.)
     - Reduced timeouts for faster failure detection
     - Keep-alive connections
+    - Independent question page calls overlapped on a worker pool
     """
     
     def __init__(self):
@@ -87,15 +112,15 @@ class APIClient:
         self.base_url = "http://localhost:17654/api"
         
         # Use thread-local storage for requests sessions
-        # This ensures each thread gets its own session object
+        # This ensures each thread gets its own session object (and cookie jar)
         self._local = threading.local()
         
         # Performance settings
-        self.default_timeout = 3  # Reduced from default 30s for faster failure detection
+        self.default_timeout = (0.5, 5.0)  # (connect, read) - localhost connects are near-instant
         self.cache_enabled = True  # Enable caching for static data
         
     def _create_session(self) -> requests.Session:
-        """Create a new requests session with optimizations."""
+        """Create a new requests session backed by the shared connection pool."""
         session = requests.Session()
         
         # Set default headers for this thread's session
@@ -105,23 +130,8 @@ class APIClient:
             'Connection': 'keep-alive'  # Enable keep-alive for connection reuse
         })
         
-        # Configure connection pooling and retry strategy
-        retry_strategy = Retry(
-            total=2,  # Reduced retries for faster failure
-            backoff_factor=0.1,  # Quick exponential backoff
-            status_forcelist=[500, 502, 503, 504],  # Retry on server errors
-            allowed_methods=["GET", "POST"]  # Retry safe methods
-        )
-        
-        adapter = HTTPAdapter(
-            pool_connections=10,  # Number of connection pools
-            pool_maxsize=20,  # Max connections per pool
-            max_retries=retry_strategy,
-            pool_block=False  # Don't block when pool is full
-        )
-        
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        session.mount("http://", _ADAPTER)
+        session.mount("https://", _ADAPTER)
         
         return session
         
@@ -131,17 +141,35 @@ class APIClient:
         if not hasattr(self._local, 'session'):
             self._local.session = self._create_session()
         return self._local.session
-    @property
-    def session(self):
-        """Get or create a thread-local requests session."""
-        if not hasattr(self._local, 'session'):
-            self._local.session = requests.Session()
-            # Set default headers for this thread's session
-            self._local.session.headers.update({
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            })
-        return self._local.session
+    
+    def submit(self, func, *args, **kwargs) -> Future:
+        """
+        Run an API call on the shared worker pool.
+        
+        The worker borrows the calling thread's session, so the call carries the
+        same API session cookie it would have if it were made directly. The
+        caller may keep using the session meanwhile: the adapter's pool is
+        thread-safe and the cookie jar serializes updates with its own lock.
+        
+        Args:
+            func: APIClient method (or any callable using it) to run
+            
+        Returns:
+            Future resolving to the call's result
+        """
+        return _executor.submit(self._call_with_session, self.session, func, args, kwargs)
+    
+    def _call_with_session(self, session: requests.Session, func, args, kwargs):
+        """Invoke func with this worker thread's session temporarily replaced."""
+        previous = getattr(self._local, 'session', None)
+        self._local.session = session
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if previous is None:
+                del self._local.session
+            else:
+                self._local.session = previous
     
     def _sync_session_cookies(self):
         """Synchronize Flask session cookies with requests session."""
@@ -149,10 +177,15 @@ class APIClient:
         pass
     
     def close_session(self):
-        """Close the thread-local session if it exists."""
+        """
+        Discard the thread-local session (and its API cookies) if it exists.
+        
+        The session is not close()d: that would close the shared _ADAPTER and
+        drop the pooled keep-alive connections of every other thread too.
+        """
         if hasattr(self._local, 'session'):
             try:
-                self._local.session.close()
+                self._local.session.cookies.clear()
             except Exception as e:
                 logger.warning(f"Error closing session: {str(e)}")
             finally:
@@ -205,10 +238,10 @@ class APIClient:
         
         cached = _cache.get(cache_key, ttl_seconds)
         if cached is not None:
-            logger.debug(f"Cache hit: {cache_key}")
+            logger.debug("Cache hit: %s", cache_key)
             return cached
         
-        logger.debug(f"Cache miss: {cache_key}")
+        logger.debug("Cache miss: %s", cache_key)
         result = fetch_func()
         _cache.set(cache_key, result)
         return result
@@ -222,6 +255,13 @@ class APIClient:
         Returns:
             Dictionary containing session_id and success message
         """
+        # Let a previous end_session_async() finish first so the old session's
+        # end can't reach the API after the new session has started
+        pending_end = getattr(self._local, 'pending_end', None)
+        if pending_end is not None:
+            self._local.pending_end = None
+            wait([pending_end])
+        
         try:
             response = self.session.post(
                 f"{self.base_url}/session/start",
@@ -274,12 +314,30 @@ class APIClient:
             if helpful_theorems is not None:
                 data["helpful_theorems"] = helpful_theorems
                 
-            response = self.session.post(f"{self.base_url}/session/end", json=data)
+            response = self.session.post(
+                f"{self.base_url}/session/end",
+                json=data,
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to end session: {str(e)}")
             raise
     
+    def end_session_async(self, **kwargs) -> Future:
+        """
+        End the current learning session without waiting for the API to answer.
+        Takes the same arguments as end_session(). Failures are logged by
+        end_session() itself; the next start_session() on this thread waits
+        for the call to complete.
+        
+        Returns:
+            Future resolving to the end_session() result
+        """
+        future = self.submit(self.end_session, **kwargs)
+        self._local.pending_end = future
+        return future
+    
     def reset_session(self) -> Dict[str, Any]:
         """
         Reset current session state without ending the session.
@@ -288,7 +346,10 @@ class APIClient:
             Dictionary containing reset confirmation and new state
         """
         try:
-            response = self.session.post(f"{self.base_url}/session/reset")
+            response = self.session.post(
+                f"{self.base_url}/session/reset",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to reset session: {str(e)}")
@@ -341,7 +402,10 @@ class APIClient:
             Dictionary containing question details
         """
         try:
-            response = self.session.get(f"{self.base_url}/questions/{question_id}")
+            response = self.session.get(
+                f"{self.base_url}/questions/{question_id}",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get question {question_id}: {str(e)}")
@@ -395,6 +459,71 @@ class APIClient:
             logger.error(f"Failed to submit answer: {str(e)}")
             raise
     
+    def get_question_bootstrap(self, include_debug: bool = False,
+                               include_answers: bool = True) -> Dict[str, Any]:
+        """
+        Get everything needed to render the question page, fetching the
+        answer options and session status concurrently with the first question.
+        
+        Args:
+            include_debug: Also return the session status (admin debug info)
+            include_answers: Also return the answer options; callers that
+                already hold them can skip fetching them again
+            
+        Returns:
+            Dictionary containing first_question and, when requested,
+            answer_options and session_status (None if unavailable)
+        """
+        try:
+            answers_future = self.submit(self.get_answer_options) if include_answers else None
+            status_future = self.submit(self.get_session_status) if include_debug else None
+            result = {"first_question": self.get_first_question()}
+            if answers_future is not None:
+                result["answer_options"] = answers_future.result()
+            if status_future is not None:
+                try:
+                    result["session_status"] = status_future.result()
+                except Exception:
+                    result["session_status"] = None
+            return result
+        except Exception as e:
+            logger.error(f"Failed to bootstrap question page: {str(e)}")
+            raise
+    
+    def submit_answer_and_next(self, question_id: int, answer_id: int,
+                               include_debug: bool = False) -> Dict[str, Any]:
+        """
+        Submit an answer and get the next question. The next question is only
+        requested once the answer is in; the session status (admin debug info)
+        is fetched alongside it.
+        
+        Args:
+            question_id: ID of the question being answered
+            answer_id: ID of the selected answer (0-3)
+            include_debug: Also return the session status (admin debug info)
+            
+        Returns:
+            Dictionary containing answer_result, next_question (None when no
+            questions remain) and, when include_debug is set, session_status
+        """
+        try:
+            result = {"answer_result": self.submit_answer(question_id, answer_id)}
+            status_future = self.submit(self.get_session_status) if include_debug else None
+            try:
+                result["next_question"] = self.get_next_question()
+            except Exception:
+                # No more questions available
+                result["next_question"] = None
+            if status_future is not None:
+                try:
+                    result["session_status"] = status_future.result()
+                except Exception:
+                    result["session_status"] = None
+            return result
+        except Exception as e:
+            logger.error(f"Failed to submit answer and get next question: {str(e)}")
+            raise
+    
     # === Theorems ===
     
     def get_all_theorems(self, active_only: bool = True, 
@@ -445,7 +574,10 @@ class APIClient:
             Dictionary containing theorem details
         """
         try:
-            response = self.session.get(f"{self.base_url}/theorems/{theorem_id}")
+            response = self.session.get(
+                f"{self.base_url}/theorems/{theorem_id}",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get theorem {theorem_id}: {str(e)}")
@@ -470,7 +602,11 @@ class APIClient:
                 "answer_id": answer_id,
                 "base_threshold": base_threshold
             }
-            response = self.session.post(f"{self.base_url}/theorems/relevant", json=data)
+            response = self.session.post(
+                f"{self.base_url}/theorems/relevant",
+                json=data,
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get relevant theorems: {str(e)}")
@@ -495,7 +631,11 @@ class APIClient:
             if limit is not None:
                 params["limit"] = str(limit)
                 
-            response = self.session.get(f"{self.base_url}/sessions/history", params=params)
+            response = self.session.get(
+                f"{self.base_url}/sessions/history",
+                params=params,
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get session history: {str(e)}")
@@ -509,7 +649,10 @@ class APIClient:
             Dictionary containing current session data
         """
         try:
-            response = self.session.get(f"{self.base_url}/sessions/current")
+            response = self.session.get(
+                f"{self.base_url}/sessions/current",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get current session data: {str(e)}")
@@ -523,7 +666,10 @@ class APIClient:
             Dictionary containing session statistics
         """
         try:
-            response = self.session.get(f"{self.base_url}/sessions/statistics")
+            response = self.session.get(
+                f"{self.base_url}/sessions/statistics",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get session statistics: {str(e)}")
@@ -574,7 +720,11 @@ class APIClient:
             if helpful_theorems is not None:
                 data["helpful_theorems"] = helpful_theorems
                 
-            response = self.session.post(f"{self.base_url}/feedback/submit", json=data)
+            response = self.session.post(
+                f"{self.base_url}/feedback/submit",
+                json=data,
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to submit feedback: {str(e)}")
@@ -590,7 +740,10 @@ class APIClient:
             Dictionary containing list of database tables
         """
         try:
-            response = self.session.get(f"{self.base_url}/db/tables")
+            response = self.session.get(
+                f"{self.base_url}/db/tables",
+                timeout=self.default_timeout
+            )
             return self._handle_response(response)
         except Exception as e:
             logger.error(f"Failed to get database tables: {str(e)}")
@@ -640,12 +793,12 @@ class APIClient:
         _cache.clear()
         logger.info("API client cache cleared")
     
-    def set_timeout(self, timeout: int):
+    def set_timeout(self, timeout: Union[float, Tuple[float, float]]):
         """
         Set custom timeout for API requests.
         
         Args:
-            timeout: Timeout in seconds
+            timeout: Timeout in seconds, or a (connect, read) tuple
         """
         self.default_timeout = timeout
         logger.info(f"API timeout set to {timeout} seconds")
@@ -1,11 +1,27 @@
 # app.py
 from flask import Flask
 from flask_session import Session
-from extensions import bcrypt
+from extensions import bcrypt, compress, cache, OrjsonProvider
 import os
 from datetime import timedelta
+from jinja2 import FileSystemBytecodeCache
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Route log records through a queue so request threads never block on
+# console writes; a background listener thread does the actual I/O.
+# Production deployments should set LOG_LEVEL=WARNING to drop per-request
+# INFO records (e.g. the dev server's access log) entirely.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler(), respect_handler_level=True)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 app.secret_key = "somesecret"
 
@@ -16,11 +32,29 @@ app.config.update(
     SESSION_TYPE='filesystem',
     SESSION_PERMANENT=True,
     PERMANENT_SESSION_LIFETIME=timedelta(hours=5),  # Session will last 5 hours
-    SESSION_FILE_THRESHOLD=500  # Maximum number of session files stored
+    SESSION_FILE_THRESHOLD=500,  # Maximum number of session files stored
+    # /answer returns lists of theorem dicts with repeated keys, which compress well
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_LEVEL=5,  # gzip level
+    COMPRESS_BR_LEVEL=5,  # brotli quality; the default 4 is tuned for speed, 11 is far too slow per request
+    COMPRESS_MIN_SIZE=500,
+    COMPRESS_MIMETYPES=['application/json', 'text/html', 'text/css', 'application/javascript'],
+    # In-process, so each worker keeps its own copy; only used for data that
+    # may be briefly stale and expires by timeout (the admin dashboard)
+    CACHE_TYPE='SimpleCache',
+    CACHE_DEFAULT_TIMEOUT=60
 )
 
+# Persist compiled templates so the first render of each page after a
+# restart skips Jinja's parse/compile step. With no directory argument Jinja
+# uses a per-user temp directory that it creates as 0700 and refuses to use
+# if another user owns it, so bytecode can't be planted by someone else.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 # Initialize extensions
 bcrypt.init_app(app)
+compress.init_app(app)
+cache.init_app(app)
 Session(app)
 
 from pages.Home_Page.Home_Page import home_page
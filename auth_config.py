@@ -25,6 +25,7 @@ def login_user(email: str, password: str) -> bool:
         'last_name': user['last_name'],
         'role': user['role']
     }
+    session['user_role'] = user['role']
 
     # עדכון last login ב-DB
     update_last_login(user['user_id'])
@@ -8,17 +8,95 @@ Description:
 
 Current Extensions:
     - Flask-Bcrypt: Handles password hashing and verification for user authentication
+    - Flask-Compress: Brotli/gzip compression of HTML, CSS, JS and JSON responses
+    - Flask-Caching: Short-lived caching of the admin dashboard queries
+    - OrjsonProvider: orjson-backed JSON provider for jsonify/request.get_json
 
 Usage:
     This extension is used in:
     1. app.py - for initializing bcrypt with the Flask application
     2. db_utils.py - for password hashing and verification functions
+    Flask-Compress is initialized in app.py and applies to every blueprint.
+    Flask-Caching is initialized in app.py and used by User_Profile_Page.py.
+    OrjsonProvider is installed in app.py as app.json.
+    conditional_response() is used by Question_Page.py for ETag/304 handling.
 
 Author: Karin Hershko and Afik Dadon
 Date: February 2025
 """
 
+import re
+
+import orjson
+from flask import request
+from flask.json.provider import DefaultJSONProvider
 from flask_bcrypt import Bcrypt
+from flask_compress import Compress
+from flask_caching import Cache
 
 # Initialize Bcrypt extension
-bcrypt = Bcrypt()
\ No newline at end of file
+bcrypt = Bcrypt()
+
+# Initialize response compression extension
+compress = Compress()
+
+# Initialize cache extension
+cache = Cache()
+
+# Flask-Compress rewrites the ETag of a compressed response to "<etag>:<algorithm>";
+# matches that suffix in a quoted header value or in a bare tag
+_COMPRESS_ETAG_SUFFIX = re.compile(r':(?:br|gzip|deflate|zstd)(?="|$)')
+
+
+def conditional_response(response):
+    """
+    Tag a rendered page with an ETag and answer with a bodyless 304 when the
+    browser already holds it.
+
+    The view computes the ETag over the uncompressed body, but Flask-Compress
+    runs afterwards and suffixes it with the algorithm, so browsers send back
+    e.g. "<etag>:br". The suffix is stripped from If-None-Match before the
+    comparison, and a 304 (which Flask-Compress leaves alone) is given the
+    suffixed tag the client sent, i.e. the ETag its 200 carried.
+    """
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, must-revalidate'
+
+    environ = request.environ
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        environ = dict(environ, HTTP_IF_NONE_MATCH=_COMPRESS_ETAG_SUFFIX.sub('', if_none_match))
+    response = response.make_conditional(environ)
+
+    if response.status_code == 304:
+        etag, _ = response.get_etag()
+        sent = request.if_none_match
+        for tag in sent.as_set(include_weak=True):
+            if tag != etag and _COMPRESS_ETAG_SUFFIX.sub('', tag) == etag:
+                response.set_etag(tag, weak=sent.is_weak(tag))
+                break
+    return response
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson.
+
+    orjson writes UTF-8 bytes directly (non-ASCII text such as Hebrew is left
+    unescaped, as with JSON_AS_ASCII=False) and keeps insertion order instead
+    of sorting keys. Types orjson doesn't know fall back to Flask's default().
+    """
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._OPTIONS),
+            mimetype=self.mimetype
+        )
\ No newline at end of file
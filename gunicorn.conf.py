@@ -0,0 +1,32 @@
+"""
+gunicorn.conf.py
+----------------
+Description:
+    Production server settings for the Geometric Learning System UI.
+    Picked up automatically by `gunicorn app:app` when run from this directory.
+
+    Every route blocks on HTTP calls to the API server and/or pyodbc queries.
+    Threaded workers let one process keep serving while other requests wait on
+    that I/O. gevent workers were ruled out: pyodbc is a C extension that
+    gevent can't patch, so a slow query would stall the whole worker.
+
+Environment:
+    - PORT: Listen port (default 10000)
+    - WEB_CONCURRENCY: Worker processes (default 2)
+    - GUNICORN_THREADS: Threads per worker (default 16)
+
+Note: Gunicorn doesn't run on Windows; use `python app.py` there.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Kept below the api_client connection pool size (64) so threads don't queue for sockets
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# API calls time out after 5s; leave headroom for the DB work around them
+timeout = 30
+keepalive = 5
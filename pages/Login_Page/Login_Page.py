@@ -50,6 +50,7 @@ def login():
             user = verify_user(email, password)
             if user:
                 session['user'] = user
+                session['user_role'] = user['role']  # Scalar copy for cheap role checks
                 update_last_login(user['user_id'])
                 UserLogger.log_login(True, email)
                 return jsonify({'success': True})
@@ -77,6 +78,7 @@ def logout():
     """Handle user logout requests."""
     UserLogger.log_logout()
     session.pop('user', None)
+    session.pop('user_role', None)
     return redirect(url_for('home_page.home'))
 
 
@@ -20,9 +20,15 @@ Date: February 2025
 Updated: November 2025 - API Integration
 """
 
-from flask import Blueprint, render_template, session, jsonify, request, redirect, url_for
+import logging
+import time
+from types import MappingProxyType
+from flask import Blueprint, render_template, session, jsonify, request, redirect, url_for, g, make_response
 from api_client import api_client
 from UserLogger import UserLogger
+from extensions import conditional_response
+
+logger = logging.getLogger(__name__)
 
 # Blueprint Configuration
 question_page = Blueprint(
@@ -32,69 +38,136 @@ question_page = Blueprint(
     static_folder='static'
 )
 
+# Answer text to API answer_id, based on the API documentation.
+# Unknown text falls back to 2 ("לא יודע").
+ANSWER_MAPPING = MappingProxyType({
+    'לא': 0,
+    'כן': 1,
+    'לא יודע': 2,
+    'כנראה': 3
+})
+
+# How long a confirmed-active API session is trusted before /check-timeout
+# asks the API again, in seconds
+_ACTIVE_CHECK_TTL = 30
+
+# Answer options are a fixed enum, the same for every session; they come with
+# the first page load and are reused for the life of the worker
+_ANSWER_OPTIONS_CACHE = None
+
+# Redirect targets for /finish, resolved once on first use
+_FINISH_REDIRECTS = {}
+
+
+def _finish_redirect_url(status):
+    """Return the post-finish redirect URL, building it with url_for only once."""
+    key = 'partial' if status == 'partial' else 'other'
+    url = _FINISH_REDIRECTS.get(key)
+    if url is None:
+        endpoint = 'question_page.question' if key == 'partial' else 'home_page.home'
+        url = _FINISH_REDIRECTS[key] = url_for(endpoint)
+    return url
+
+
+def _theorem_row(theorem):
+    """
+    Format a theorem for the frontend as a positional row, in the order
+    Question_Page.js reads it: [id, text, weight, category]. The API's
+    combined_score isn't displayed, so it isn't sent. Missing weight or
+    category fall back to 0.
+    """
+    return (
+        theorem.get('theorem_id'),
+        theorem.get('theorem_text'),
+        theorem.get('weight', 0),
+        theorem.get('category', 0)
+    )
+
+
+def _user_role():
+    """
+    Return the logged-in user's role. Sessions created before the scalar
+    user_role copy was stored (they last 5 hours) only have it on the user dict.
+    """
+    return session.get('user_role') or (session.get('user') or {}).get('role', 'user')
+
+
+def _answers(payload):
+    """Return the answer options, caching them from the first bootstrap payload."""
+    global _ANSWER_OPTIONS_CACHE
+    if _ANSWER_OPTIONS_CACHE is not None:
+        return _ANSWER_OPTIONS_CACHE
+
+    answers = (payload.get('answer_options') or {}).get('answers', [])
+    if answers:
+        _ANSWER_OPTIONS_CACHE = answers
+    return answers
+
+
+def _log(kind, *args):
+    """Queue a UserLogger.log_<kind> call to be written after the request."""
+    g.setdefault('pending_logs', []).append((kind, args))
+
 
 @question_page.after_request
 def after_request(response):
-    """Clean up API client session after each request."""
-    # This ensures thread-local sessions are properly cleaned up
-    # helping to prevent SQLite threading issues
+    """Write the request's queued log entries in a single transaction."""
+    pending_logs = g.pop('pending_logs', None)
+    if pending_logs:
+        with UserLogger.batch() as batch:
+            for kind, args in pending_logs:
+                getattr(batch, f'log_{kind}')(*args)
     return response
 
 
-@question_page.before_request
-def check_active_session():
-    """Middleware to ensure API session state is initialized.
-    Creates a new API session if one doesn't exist."""
+def _submit_answer(question_id, answer_id, include_debug):
+    """Submit an answer, re-bootstrapping the API session once if it has gone away.
+    Routes trust the api_session_active flag instead of checking the API session
+    before every request, so a lost session only surfaces here as a failed call."""
     try:
-        # Check if we have an active API session
-        api_status = api_client.get_session_status()
-        if not api_status.get('active', False):
-            # Start a new API session
-            api_client.start_session()
-    except Exception as e:
-        # If API is not available or session creation fails, start a new one
-        try:
-            api_client.start_session()
-        except Exception as start_error:
-            print(f"Failed to start API session: {str(start_error)}")
-            # Continue with local fallback if needed
+        return api_client.submit_answer_and_next(question_id, answer_id, include_debug=include_debug)
+    except Exception:
+        if api_client.get_session_status().get('active', False):
+            raise
+        logger.warning("API session inactive while answering; starting a new one")
+        api_client.start_session()
+        session['api_session_active'] = True
+        return api_client.submit_answer_and_next(question_id, answer_id, include_debug=include_debug)
 
 
 @question_page.route('/')
 def question():
     """Render main question interface."""
-    user = session.get('user', None)
-    user_role = user.get('role', 'user') if user else 'user'
-    is_logged_in = user is not None
-
-    if not is_logged_in:
+    if 'user' not in session:
         return redirect(url_for('login_page.login'))
+    user_role = _user_role()
 
     try:
         # Start a new API session and get the first question
         api_client.start_session()
-        UserLogger.log_session_start("NEW_SESSION")
-
-        # Get first question from API
-        question_data = api_client.get_first_question()
+        if not session.get('api_session_active'):
+            session['api_session_active'] = True
+        _log('session_start', "NEW_SESSION")
+
+        # First question, answer options (until cached) and (for admins)
+        # debug state, fetched concurrently
+        payload = api_client.get_question_bootstrap(
+            include_debug=user_role == 'admin',
+            include_answers=_ANSWER_OPTIONS_CACHE is None
+        )
+        question_data = payload.get('first_question') or {}
         question_id = question_data.get('question_id')
         question_text = question_data.get('question_text')
 
         # For admin users, get debug information (if available via API)
         debug_info = None
-        if user_role == 'admin':
-            try:
-                # Try to get session status for debug info
-                status = api_client.get_session_status()
-                debug_info = status.get('state', {})
-            except Exception:
-                debug_info = None
-
-        # Get answer options from API
-        answer_options = api_client.get_answer_options()
-        answers = answer_options.get('answers', [])
-
-        return render_template(
+        status = payload.get('session_status')
+        if status is not None:
+            debug_info = status.get('state', {})
+
+        answers = _answers(payload)
+
+        response = make_response(render_template(
             'Question_Page.html',
             user_role=user_role,
             question_id=question_id,
@@ -102,15 +175,19 @@ def question():
             debug_info=debug_info,
             answer_options=answers,
             initial_theorems=[]  # Will be populated after first answer
-        )
-    except Exception as e:
-        print(f"Error in question route: {str(e)}")
+        ))
+        # Identical pages (same first question and answers) are answered with
+        # a bodyless 304 when the browser already has them
+        return conditional_response(response)
+    except Exception:
+        logger.exception("Error in question route")
         return redirect(url_for('login_page.login'))
 
 
 @question_page.route('/answer', methods=['POST'])
 def process_answer():
     """Process user's answer to current question using the API."""
+    user_role = _user_role()
     data = request.get_json()
     question_id = data.get('question_id')
     answer = data.get('answer')
@@ -118,43 +195,27 @@ def process_answer():
     try:
         # Convert answer text to answer_id if necessary
         # The API expects answer_id (0-3), but UI might send text
-        answer_id = answer
-        if isinstance(answer, str):
-            # Map answer text to ID based on API documentation
-            answer_mapping = {
-                'לא': 0,
-                'כן': 1, 
-                'לא יודע': 2,
-                'כנראה': 3
-            }
-            answer_id = answer_mapping.get(answer, 2)  # Default to "לא יודע"
-
-        # Submit answer to API
-        answer_result = api_client.submit_answer(question_id, answer_id)
+        answer_id = ANSWER_MAPPING.get(answer, 2) if isinstance(answer, str) else answer
+
+        # Submit answer and get the next question (plus admin debug state)
+        result = _submit_answer(
+            question_id, answer_id,
+            include_debug=user_role == 'admin'
+        )
+        answer_result = result.get('answer_result') or {}
         
-        UserLogger.log_question_answer(question_id, f"Answer ID: {answer_id}", answer)
-
-        # Get next question from API
-        try:
-            next_question_data = api_client.get_next_question()
-            next_question_id = next_question_data.get('question_id')
-            next_question_text = next_question_data.get('question_text')
-        except Exception:
-            # If no more questions available, end session
-            next_question_id = None
-            next_question_text = None
+        _log('question_answer', question_id, f"Answer ID: {answer_id}", answer)
+
+        # No next question means the session has run out of questions
+        next_question_data = result.get('next_question') or {}
+        next_question_id = next_question_data.get('question_id')
+        next_question_text = next_question_data.get('question_text')
 
         # Get relevant theorems from answer submission result
         relevant_theorems = answer_result.get('relevant_theorems', [])
         
-        # Format theorems for response
-        formatted_theorems = [{
-            'id': theorem.get('theorem_id'),
-            'text': theorem.get('theorem_text'),
-            'weight': theorem.get('weight', 0),
-            'category': theorem.get('category', 0),
-            'combined_score': theorem.get('combined_score', 0)
-        } for theorem in relevant_theorems]
+        # Format theorems for response as positional rows
+        formatted_theorems = list(map(_theorem_row, relevant_theorems))
 
         # Get updated weights from answer result
         updated_weights = answer_result.get('updated_weights', {})
@@ -170,17 +231,14 @@ def process_answer():
         }
 
         # Add debug info for admin users
-        if session.get('user', {}).get('role') == 'admin':
-            try:
-                status = api_client.get_session_status()
-                response_data['debug'] = status.get('state', {})
-            except Exception:
-                pass
+        status = result.get('session_status')
+        if status is not None:
+            response_data['debug'] = status.get('state', {})
 
         return jsonify(response_data)
 
     except Exception as e:
-        print(f"Error in answer route: {str(e)}")
+        logger.exception("Error in answer route")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -198,30 +256,27 @@ def finish_session():
         if not user:
             return jsonify({'success': False, 'error': 'Not authenticated'}), 401
 
-        # End the API session with optional feedback
-        try:
-            api_client.end_session(
-                feedback=feedback_id,
-                triangle_types=triangle_types,
-                helpful_theorems=helpful_theorems,
-                save_to_db=True
-            )
-        except Exception as api_error:
-            print(f"API session end failed: {str(api_error)}")
-            # Continue with local cleanup
+        # End the API session with optional feedback in the background; the
+        # user is being redirected and doesn't need to wait for it
+        api_client.end_session_async(
+            feedback=feedback_id,
+            triangle_types=triangle_types,
+            helpful_theorems=helpful_theorems,
+            save_to_db=True
+        )
+        session.pop('api_session_active', None)
+        session.pop('last_active_check_ts', None)
 
-        UserLogger.log_session_end(status, None)
+        _log('session_end', status, None)
 
-        redirect_url = (url_for('question_page.question')
-                        if status == 'partial'
-                        else url_for('home_page.home'))
+        redirect_url = _finish_redirect_url(status)
 
         return jsonify({
             'success': True,
             'redirect': redirect_url
         })
     except Exception as e:
-        print(f"Error in finish_session: {str(e)}")
+        logger.exception("Error in finish_session")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -230,41 +285,46 @@ def cleanup_session():
     """Clean up session data while preserving authentication."""
     try:
         user_data = session.get('user')
+        user_role = session.get('user_role')
 
-        # End the API session if active
-        try:
-            api_client.end_session(save_to_db=False)  # Don't save on cleanup
-        except Exception as api_error:
-            print(f"API cleanup failed: {str(api_error)}")
-            # Continue with local cleanup
+        # End the API session if active, without waiting for the API
+        api_client.end_session_async(save_to_db=False)  # Don't save on cleanup
 
         # Clear local Flask session data except user authentication
-        for key in list(session.keys()):
-            if key != 'user':
-                session.pop(key, None)
-
+        session.clear()
         if user_data:
             session['user'] = user_data
-            session.modified = True
+        if user_role:
+            session['user_role'] = user_role
+        session.modified = True
 
-        UserLogger.log_session_end("CLEANUP", None)
+        _log('session_end', "CLEANUP", None)
         return jsonify({'success': True})
 
     except Exception as e:
-        print(f"Error in cleanup_session: {str(e)}")
+        logger.exception("Error in cleanup_session")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @question_page.route('/check-timeout', methods=['GET'])
 def check_timeout():
     """Check if current session has timed out using API."""
+    now = time.time()
+    if session.get('api_session_active') and now - session.get('last_active_check_ts', 0) < _ACTIVE_CHECK_TTL:
+        return jsonify({'timeout': False})
+
     try:
         # Check API session status
         status = api_client.get_session_status()
         is_active = status.get('active', False)
+        if is_active:
+            session['last_active_check_ts'] = now
+        else:
+            session.pop('api_session_active', None)
+            session.pop('last_active_check_ts', None)
         
         # If API session is not active, consider it timed out
         return jsonify({'timeout': not is_active})
     except Exception as e:
-        print(f"Error in check_timeout route: {str(e)}")
+        logger.exception("Error in check_timeout route")
         return jsonify({'timeout': True, 'error': str(e)}), 500
\ No newline at end of file
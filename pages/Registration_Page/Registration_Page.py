@@ -25,22 +25,27 @@ registration_page = Blueprint('registration_page', __name__,
                               template_folder='templates',
                               static_folder='static')
 
+# Validation patterns, compiled once at import
+_NAME_RE = re.compile(r'^[\u0590-\u05FFa-zA-Z\s]+$')
+_EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+_UPPER_RE = re.compile(r'[A-Z]')
+_LOWER_RE = re.compile(r'[a-z]')
+_DIGIT_RE = re.compile(r'\d')
+
 
 class InputValidator:
     """Handles validation of user input for registration."""
     @staticmethod
     def validate_name(name: str, field_name: str) -> tuple[bool, str | None]:
         """Validate a name field (first name or last name). """
-        name_pattern = r'^[\u0590-\u05FFa-zA-Z\s]+$'
-        if not re.match(name_pattern, name):
+        if not _NAME_RE.match(name):
             return False, f'{field_name} חייב להכיל אותיות בלבד'
         return True, None
 
     @staticmethod
     def validate_email(email: str) -> tuple[bool, str | None]:
         """ Validate email format. """
-        email_pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        if not re.match(email_pattern, email):
+        if not _EMAIL_RE.match(email):
             return False, 'כתובת אימייל לא תקינה'
         return True, None
 
@@ -49,11 +54,11 @@ class InputValidator:
         """Validate password strength."""
         if len(password) < 8:
             return False, 'הסיסמה חייבת להכיל לפחות 8 תווים'
-        if not re.search(r'[A-Z]', password):
+        if not _UPPER_RE.search(password):
             return False, 'הסיסמה חייבת להכיל לפחות אות גדולה אחת'
-        if not re.search(r'[a-z]', password):
+        if not _LOWER_RE.search(password):
             return False, 'הסיסמה חייבת להכיל לפחות אות קטנה אחת'
-        if not re.search(r'\d', password):
+        if not _DIGIT_RE.search(password):
             return False, 'הסיסמה חייבת להכיל לפחות ספרה אחת'
         return True, None
 
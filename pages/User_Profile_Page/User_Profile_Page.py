@@ -21,9 +21,34 @@ Date: February 2025
 Updated: November 2025 - API Integration
 """
 
+import logging
 from flask import Blueprint, render_template, session, redirect, url_for
 from db_utils import get_db_connection
 from api_client import api_client
+from extensions import cache
+
+logger = logging.getLogger(__name__)
+
+# Per-user profile queries. Both are served by an index on
+# UserLogs (user_id, action_type, timestamp) where it exists.
+
+# One pass over the user's rows for the three profile counters
+_Q_USER_STATS = """
+    SELECT
+        ISNULL(SUM(CASE WHEN action_type = 'SESSION_START' THEN 1 ELSE 0 END), 0) as total_starts,
+        ISNULL(SUM(CASE WHEN action_type = 'SESSION_END' THEN 1 ELSE 0 END), 0) as total_completed,
+        ISNULL(SUM(CASE WHEN action_type = 'LOGIN_ATTEMPT' THEN 1 ELSE 0 END), 0) as login_count
+    FROM UserLogs
+    WHERE user_id = ?
+      AND action_type IN ('SESSION_START', 'SESSION_END', 'LOGIN_ATTEMPT')
+"""
+
+_Q_RECENT_ACTIVITY = """
+    SELECT TOP 5 timestamp, action_type
+    FROM UserLogs
+    WHERE user_id = ?
+    ORDER BY timestamp DESC
+"""
 
 user_profile_page = Blueprint('user_profile_page', __name__,
                               template_folder='templates',
@@ -38,55 +63,36 @@ def profile():
         return redirect(url_for('login_page.login'))
 
     try:
+        # Cached; opens its own connection only when recomputing
+        admin_stats = _get_admin_statistics() if user['role'] == 'admin' else None
         with get_db_connection() as conn:
             cursor = conn.cursor()
             user_stats = _get_user_statistics(cursor, user['user_id'])
             recent_activity = _get_recent_activity(cursor, user) if user['role'] != 'admin' else None
-            admin_stats = _get_admin_statistics(cursor) if user['role'] == 'admin' else None
 
-            return render_template('User_Profile_Page.html',
-                                   user=user,
-                                   user_stats=user_stats,
-                                   recent_activity=recent_activity,
-                                   admin_stats=admin_stats)
+        return render_template('User_Profile_Page.html',
+                               user=user,
+                               user_stats=user_stats,
+                               recent_activity=recent_activity,
+                               admin_stats=admin_stats)
 
-    except Exception as e:
+    except Exception:
         # Log the error but return a graceful fallback
-        print(f"Database error: {str(e)}")
+        logger.exception("Database error")
         return _render_fallback_profile(user)
 
 
+def _row_to_dict(cursor, row):
+    """Convert a pyodbc row to a plain dict so it can be cached (rows don't pickle)."""
+    return dict(zip((column[0] for column in cursor.description), row))
+
+
 def _get_user_statistics(cursor, user_id):
-    """Retrieve user activity statistics."""
-    cursor.execute("""
-        WITH UserSessions AS (
-            SELECT COUNT(*) as total_starts
-            FROM UserLogs 
-            WHERE user_id = ? AND action_type = 'SESSION_START'
-        ),
-        CompletedSessions AS (
-            SELECT COUNT(*) as total_completed
-            FROM UserLogs 
-            WHERE user_id = ? AND action_type = 'SESSION_END'
-        ),
-        LoginAttempts AS (
-            SELECT COUNT(*) as login_count
-            FROM UserLogs 
-            WHERE user_id = ? AND action_type = 'LOGIN_ATTEMPT'
-        )
-        SELECT 
-            ISNULL(UserSessions.total_starts, 0) as total_sessions,
-            CASE 
-                WHEN ISNULL(CompletedSessions.total_completed, 0) > ISNULL(UserSessions.total_starts, 0) 
-                THEN ISNULL(UserSessions.total_starts, 0)
-                ELSE ISNULL(CompletedSessions.total_completed, 0)
-            END as completed_sessions,
-            ISNULL(LoginAttempts.login_count, 0) as login_count
-        FROM UserSessions
-        CROSS JOIN CompletedSessions
-        CROSS JOIN LoginAttempts
-    """, (user_id, user_id, user_id))
-    return cursor.fetchone()
+    """Retrieve user activity statistics as (sessions, completed, logins)."""
+    cursor.execute(_Q_USER_STATS, (user_id,))
+    starts, completed, logins = cursor.fetchone()
+    # A session can't be completed more often than it was started
+    return starts, min(starts, completed), logins
 
 
 def _get_recent_activity(cursor, user):
@@ -94,52 +100,50 @@ def _get_recent_activity(cursor, user):
     if user['role'] == 'admin':
         return None
 
-    cursor.execute("""
-        SELECT TOP 5 timestamp, action_type
-        FROM UserLogs
-        WHERE user_id = ?
-        ORDER BY timestamp DESC
-    """, (user['user_id'],))
+    cursor.execute(_Q_RECENT_ACTIVITY, (user['user_id'],))
     return cursor.fetchall()
 
 
-def _get_admin_statistics(cursor):
-    """Get system-wide statistics for admin dashboard with API integration."""
-    # Get system overview statistics from local database
+@cache.memoize(timeout=60)
+def _get_admin_statistics():
+    """
+    Get system-wide statistics for admin dashboard with API integration.
+    Cached for a minute; these figures move on a minute scale, not per request.
+    """
+    with get_db_connection() as conn:
+        return _query_admin_statistics(conn.cursor())
+
+
+def _query_admin_statistics(cursor):
+    """Collect the admin dashboard data from the database and the API."""
+    # The API calls hit a different backend, so start them before the DB work
+    stats_future = api_client.submit(api_client.get_session_statistics)
+    theorems_future = api_client.submit(api_client.get_all_theorems, active_only=True)
+
+    # System overview and question analytics from the local database in a
+    # single round trip. Question analytics is still from local logs for now;
+    # this could be enhanced to use API data in the future.
     cursor.execute("""
+        SET NOCOUNT ON;
+        DECLARE @now DATETIME = GETDATE();
+
         SELECT 
             (SELECT COUNT(*) FROM Users) as total_users,
-            (SELECT COUNT(DISTINCT user_id) 
-             FROM UserLogs 
-             WHERE timestamp >= DATEADD(day, -1, GETDATE())) as active_users_day,
-            (SELECT COUNT(DISTINCT user_id) 
-             FROM UserLogs 
-             WHERE timestamp >= DATEADD(day, -7, GETDATE())) as active_users_week,
-            (SELECT COUNT(*) 
-             FROM UserLogs 
-             WHERE action_type = 'SESSION_END' 
-             AND action_data LIKE '%"final_theorem_id"%'
-             AND action_data NOT LIKE '%"final_theorem_id": null%') as completed_exercises
-    """)
-    system_stats = cursor.fetchone()
-
-    # Get geometry learning statistics from API
-    api_stats = None
-    theorems_data = []
-    try:
-        # Get session statistics from API
-        api_stats = api_client.get_session_statistics()
-        
-        # Get theorems data from API
-        theorems_response = api_client.get_all_theorems(active_only=True)
-        theorems_data = theorems_response.get('theorems', [])
-        
-    except Exception as e:
-        print(f"Failed to get API statistics: {str(e)}")
+            ISNULL(logs.active_users_day, 0) as active_users_day,
+            ISNULL(logs.active_users_week, 0) as active_users_week,
+            ISNULL(logs.completed_exercises, 0) as completed_exercises
+        FROM (
+            -- The three UserLogs figures from a single scan
+            SELECT 
+                COUNT(DISTINCT CASE WHEN timestamp >= DATEADD(day, -1, @now) THEN user_id END) as active_users_day,
+                COUNT(DISTINCT CASE WHEN timestamp >= DATEADD(day, -7, @now) THEN user_id END) as active_users_week,
+                SUM(CASE WHEN action_type = 'SESSION_END'
+                          AND action_data LIKE '%"final_theorem_id"%'
+                          AND action_data NOT LIKE '%"final_theorem_id": null%'
+                         THEN 1 ELSE 0 END) as completed_exercises
+            FROM UserLogs
+        ) logs;
 
-    # Question analytics is still from local logs for now
-    # This could be enhanced to use API data in the future
-    cursor.execute("""
         SELECT 
             ISNULL(JSON_VALUE(action_data, '$.question_id'), 'unknown') as question_id,
             'N/A' as question_text,
@@ -149,9 +153,20 @@ def _get_admin_statistics(cursor):
         FROM UserLogs
         WHERE action_type = 'QUESTION_ANSWER'
         GROUP BY JSON_VALUE(action_data, '$.question_id')
-        ORDER BY total_asked DESC
+        ORDER BY total_asked DESC;
     """)
-    question_analytics = cursor.fetchall()
+    system_stats = _row_to_dict(cursor, cursor.fetchone())
+    cursor.nextset()
+    question_analytics = [_row_to_dict(cursor, row) for row in cursor.fetchall()]
+
+    # Get geometry learning statistics from API
+    api_stats = None
+    theorems_data = []
+    try:
+        api_stats = stats_future.result()
+        theorems_data = theorems_future.result().get('theorems', [])
+    except Exception as e:
+        logger.warning("Failed to get API statistics: %s", e)
 
     return {
         'system_stats': system_stats,
@@ -9,63 +9,84 @@ Usage:
     python performance_test.py
 """
 
+import sys
 import time
+from bisect import bisect_right
 from api_client import api_client
-import statistics
+
+# Response-time bands, fastest first: upper bounds in ms, then the icon and
+# label printed for each band (the last band has no upper bound)
+_RATING_LIMITS = (100, 300, 500)
+_RATING_ICONS = ("🚀", "✅", "⚠️ ", "❌")
+_RATINGS = ("🚀 Excellent", "✅ Good", "⚠️  Acceptable", "❌ Slow")
+
+# Overall grade bands for the summary, same layout as the ratings above
+_GRADE_LIMITS = (150, 250, 350, 500)
+_GRADES = (
+    ("🏆", "A+ (Excellent)"),
+    ("🌟", "A  (Very Good)"),
+    ("✅", "B  (Good)"),
+    ("⚠️ ", "C  (Acceptable)"),
+    ("❌", "D  (Needs Improvement)"),
+)
+
+def _rating(time_ms):
+    """Return the index of the band a response time falls in."""
+    # bisect_right: a time equal to a bound belongs to the next, slower band
+    return bisect_right(_RATING_LIMITS, time_ms)
 
 print("⚡ API Performance Testing Suite")
 print("=" * 70)
 
 def measure_time(func, *args, **kwargs):
-    """Measure execution time of a function."""
-    start = time.time()
+    """Measure execution time of a function, in integer nanoseconds."""
+    start = time.perf_counter_ns()
     try:
         result = func(*args, **kwargs)
-        elapsed = (time.time() - start) * 1000  # Convert to ms
-        return elapsed, True, result
+        return time.perf_counter_ns() - start, True, result
     except Exception as e:
-        elapsed = (time.time() - start) * 1000
-        return elapsed, False, str(e)
+        return time.perf_counter_ns() - start, False, str(e)
 
 def run_benchmark(name, func, runs=3, *args, **kwargs):
-    """Run a benchmark multiple times and report statistics."""
-    times = []
+    """
+    Run a benchmark multiple times and report statistics.
+    Returns (average ms, result of the last run) so callers can reuse the
+    data they just fetched instead of calling the endpoint again.
+    """
+    # Running aggregate in ns instead of a list of samples; ms only for display
+    total_ns = 0
+    min_ns = None
+    max_ns = 0
     success_count = 0
     
     print(f"\n📊 Testing: {name}")
     print("-" * 70)
     
     for i in range(runs):
-        elapsed, success, result = measure_time(func, *args, **kwargs)
-        times.append(elapsed)
+        elapsed_ns, success, result = measure_time(func, *args, **kwargs)
+        total_ns += elapsed_ns
+        if min_ns is None or elapsed_ns < min_ns:
+            min_ns = elapsed_ns
+        if elapsed_ns > max_ns:
+            max_ns = elapsed_ns
         if success:
             success_count += 1
         status = "✅" if success else "❌"
-        print(f"   Run {i+1}: {elapsed:7.2f}ms {status}")
+        print(f"   Run {i+1}: {elapsed_ns / 1e6:7.2f}ms {status}")
     
-    if times:
-        avg = statistics.mean(times)
-        min_time = min(times)
-        max_time = max(times)
+    if runs > 0:
+        avg = total_ns / runs / 1e6
         
         print(f"\n   Average: {avg:7.2f}ms")
-        print(f"   Min:     {min_time:7.2f}ms")
-        print(f"   Max:     {max_time:7.2f}ms")
+        print(f"   Min:     {min_ns / 1e6:7.2f}ms")
+        print(f"   Max:     {max_ns / 1e6:7.2f}ms")
         print(f"   Success: {success_count}/{runs}")
         
         # Performance rating
-        if avg < 100:
-            rating = "🚀 Excellent"
-        elif avg < 300:
-            rating = "✅ Good"
-        elif avg < 500:
-            rating = "⚠️  Acceptable"
-        else:
-            rating = "❌ Slow"
-        print(f"   Rating:  {rating}")
+        print(f"   Rating:  {_RATINGS[_rating(avg)]}")
         
-        return avg
-    return None
+        return avg, result
+    return None, None
 
 # Clear cache before testing
 print("\n🧹 Clearing cache for clean test...")
@@ -75,7 +96,7 @@ api_client.clear_cache()
 print("\n" + "=" * 70)
 print("Test 1: Health Check (lightest endpoint)")
 print("=" * 70)
-health_time = run_benchmark("Health Check", api_client.health_check, runs=5)
+health_time, _ = run_benchmark("Health Check", api_client.health_check, runs=5)
 
 # Test 2: Session Operations
 print("\n" + "=" * 70)
@@ -83,10 +104,10 @@ print("Test 2: Session Operations")
 print("=" * 70)
 
 print("\n📝 Session Start")
-session_start_time = run_benchmark("Session Start", api_client.start_session, runs=3)
+session_start_time, _ = run_benchmark("Session Start", api_client.start_session, runs=3)
 
 print("\n📝 Session Status")
-status_time = run_benchmark("Session Status", api_client.get_session_status, runs=3)
+status_time, _ = run_benchmark("Session Status", api_client.get_session_status, runs=3)
 
 # Clean up session
 try:
@@ -102,12 +123,12 @@ print("=" * 70)
 # Clear cache and test uncached
 api_client.clear_cache()
 print("\n🔥 First Call (Uncached):")
-uncached_time = run_benchmark("Answer Options (uncached)", 
-                              api_client.get_answer_options, runs=1)
+uncached_time, _ = run_benchmark("Answer Options (uncached)", 
+                                 api_client.get_answer_options, runs=1)
 
 print("\n⚡ Subsequent Calls (Cached):")
-cached_time = run_benchmark("Answer Options (cached)", 
-                           api_client.get_answer_options, runs=5)
+cached_time, _ = run_benchmark("Answer Options (cached)", 
+                              api_client.get_answer_options, runs=5)
 
 if uncached_time and cached_time:
     improvement = ((uncached_time - cached_time) / uncached_time) * 100
@@ -124,17 +145,19 @@ try:
     api_client.start_session()
     
     print("\n📝 First Question")
-    first_q_time = run_benchmark("Get First Question", 
-                                 api_client.get_first_question, runs=3)
+    first_q_time, first_q = run_benchmark("Get First Question", 
+                                          api_client.get_first_question, runs=3)
+    # Answer the question the API actually served rather than assuming ID 1
+    first_q_id = first_q.get('question_id', 1) if isinstance(first_q, dict) else 1
     
     print("\n📝 Submit Answer")
-    submit_time = run_benchmark("Submit Answer", 
-                               api_client.submit_answer, runs=3, 
-                               question_id=1, answer_id=1)
+    submit_time, _ = run_benchmark("Submit Answer", 
+                                  api_client.submit_answer, runs=3, 
+                                  question_id=first_q_id, answer_id=1)
     
     print("\n📝 Next Question")
-    next_q_time = run_benchmark("Get Next Question", 
-                               api_client.get_next_question, runs=3)
+    next_q_time, _ = run_benchmark("Get Next Question", 
+                                  api_client.get_next_question, runs=3)
     
     # Clean up
     api_client.end_session(save_to_db=False)
@@ -149,39 +172,42 @@ print("=" * 70)
 
 api_client.clear_cache()
 print("\n🔥 Uncached:")
-theorems_uncached = run_benchmark("Get All Theorems (uncached)", 
-                                 api_client.get_all_theorems, runs=1)
+theorems_uncached, _ = run_benchmark("Get All Theorems (uncached)", 
+                                    api_client.get_all_theorems, runs=1)
 
 print("\n⚡ Cached:")
-theorems_cached = run_benchmark("Get All Theorems (cached)", 
-                               api_client.get_all_theorems, runs=5)
+theorems_cached, _ = run_benchmark("Get All Theorems (cached)", 
+                                  api_client.get_all_theorems, runs=5)
 
 # Test 6: Concurrent Requests Simulation
 print("\n" + "=" * 70)
-print("Test 6: Rapid Sequential Requests")
+print("Test 6: Concurrent Requests")
 print("=" * 70)
 
-import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def _timed_answer_options(i):
+    """Time one answer-options call; returns ns, or None if it failed."""
+    start = time.perf_counter_ns()
+    try:
+        api_client.get_answer_options()  # Cached, should be fast
+        return time.perf_counter_ns() - start
+    except Exception as e:
+        print(f"   ❌ Request {i+1} failed: {e}")
+        return None
 
-def rapid_fire_test(iterations=10):
-    """Test rapid sequential requests."""
-    times = []
-    start_total = time.time()
+def rapid_fire_test(iterations=10, workers=8):
+    """Test concurrent requests through the client's shared connection pool."""
+    start_total = time.perf_counter_ns()
     
-    for i in range(iterations):
-        start = time.time()
-        try:
-            api_client.get_answer_options()  # Cached, should be fast
-            elapsed = (time.time() - start) * 1000
-            times.append(elapsed)
-        except Exception as e:
-            print(f"   ❌ Request {i+1} failed: {e}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        times = [t for t in executor.map(_timed_answer_options, range(iterations)) if t is not None]
     
-    total_time = (time.time() - start_total) * 1000
+    total_time = (time.perf_counter_ns() - start_total) / 1e6
     
     if times:
-        avg = statistics.mean(times)
-        print(f"\n   Total Requests: {len(times)}")
+        avg = sum(times) / len(times) / 1e6
+        print(f"\n   Total Requests: {len(times)} ({workers} concurrent)")
         print(f"   Total Time:     {total_time:.2f}ms")
         print(f"   Average/Request: {avg:.2f}ms")
         print(f"   Throughput:     {len(times) / (total_time/1000):.2f} req/sec")
@@ -191,9 +217,11 @@ def rapid_fire_test(iterations=10):
 rapid_time = rapid_fire_test(20)
 
 # Summary Report
-print("\n" + "=" * 70)
-print("📊 PERFORMANCE SUMMARY")
-print("=" * 70)
+# Collected into one buffer and written at the end in a single call
+report = []
+report.append("\n" + "=" * 70)
+report.append("📊 PERFORMANCE SUMMARY")
+report.append("=" * 70)
 
 results = {
     "Health Check": health_time,
@@ -206,59 +234,37 @@ results = {
     "Rapid Fire (avg)": rapid_time,
 }
 
-print("\n Response Times:")
-print("-" * 70)
+report.append("\n Response Times:")
+report.append("-" * 70)
 for name, time_ms in results.items():
     if time_ms:
-        if time_ms < 100:
-            status = "🚀"
-        elif time_ms < 300:
-            status = "✅"
-        elif time_ms < 500:
-            status = "⚠️ "
-        else:
-            status = "❌"
-        print(f"   {status} {name:25s}: {time_ms:7.2f}ms")
+        report.append(f"   {_RATING_ICONS[_rating(time_ms)]} {name:25s}: {time_ms:7.2f}ms")
 
 # Cache Effectiveness
-print("\n Cache Performance:")
-print("-" * 70)
+report.append("\n Cache Performance:")
+report.append("-" * 70)
 if uncached_time and cached_time:
-    print(f"   Uncached Request:  {uncached_time:7.2f}ms")
-    print(f"   Cached Request:    {cached_time:7.2f}ms")
-    print(f"   Speed Improvement: {uncached_time/cached_time:.1f}x faster")
-    print(f"   Time Saved:        {uncached_time - cached_time:.2f}ms per request")
+    report.append(f"   Uncached Request:  {uncached_time:7.2f}ms")
+    report.append(f"   Cached Request:    {cached_time:7.2f}ms")
+    report.append(f"   Speed Improvement: {uncached_time/cached_time:.1f}x faster")
+    report.append(f"   Time Saved:        {uncached_time - cached_time:.2f}ms per request")
 
 # Overall Assessment
-print("\n Overall Assessment:")
-print("-" * 70)
+report.append("\n Overall Assessment:")
+report.append("-" * 70)
 
 avg_times = [t for t in results.values() if t is not None]
 if avg_times:
-    overall_avg = statistics.mean(avg_times)
+    overall_avg = sum(avg_times) / len(avg_times)
     
-    if overall_avg < 150:
-        grade = "A+ (Excellent)"
-        emoji = "🏆"
-    elif overall_avg < 250:
-        grade = "A  (Very Good)"
-        emoji = "🌟"
-    elif overall_avg < 350:
-        grade = "B  (Good)"
-        emoji = "✅"
-    elif overall_avg < 500:
-        grade = "C  (Acceptable)"
-        emoji = "⚠️ "
-    else:
-        grade = "D  (Needs Improvement)"
-        emoji = "❌"
+    emoji, grade = _GRADES[bisect_right(_GRADE_LIMITS, overall_avg)]
     
-    print(f"   {emoji} Performance Grade: {grade}")
-    print(f"   Average Response Time: {overall_avg:.2f}ms")
+    report.append(f"   {emoji} Performance Grade: {grade}")
+    report.append(f"   Average Response Time: {overall_avg:.2f}ms")
 
 # Recommendations
-print("\n Recommendations:")
-print("-" * 70)
+report.append("\n Recommendations:")
+report.append("-" * 70)
 
 recommendations = []
 
@@ -275,12 +281,14 @@ if rapid_time and rapid_time > 50:
     recommendations.append("⚠️  High rapid-fire latency - ensure connection pooling is active")
 
 if not recommendations:
-    print("   ✅ All metrics are within acceptable ranges!")
-    print("   ✅ No immediate optimizations needed")
+    report.append("   ✅ All metrics are within acceptable ranges!")
+    report.append("   ✅ No immediate optimizations needed")
 else:
     for rec in recommendations:
-        print(f"   {rec}")
+        report.append(f"   {rec}")
 
-print("\n" + "=" * 70)
-print("Performance testing complete! See PERFORMANCE_OPTIMIZATION.md for more details.")
-print("=" * 70)
+report.append("\n" + "=" * 70)
+report.append("Performance testing complete! See PERFORMANCE_OPTIMIZATION.md for more details.")
+report.append("=" * 70)
+
+sys.stdout.write("\n".join(report) + "\n")
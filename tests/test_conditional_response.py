@@ -0,0 +1,75 @@
+"""
+test_conditional_response.py
+----------------------------
+Description:
+    Checks that conditional_response() answers revalidation requests with a 304
+    when the page went through Flask-Compress, whose ETag ("<etag>:br" or
+    "<etag>:gzip") is what a real browser sends back in If-None-Match.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from flask import Flask, make_response
+
+from extensions import compress, conditional_response
+
+
+class ConditionalResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        # Same compression settings as app.py
+        app.config.update(
+            COMPRESS_ALGORITHM=['br', 'gzip'],
+            COMPRESS_MIN_SIZE=500,
+            COMPRESS_MIMETYPES=['text/html'],
+        )
+        compress.init_app(app)
+
+        @app.route('/page')
+        def page():
+            return conditional_response(make_response('<p>' + 'שאלה ' * 500 + '</p>'))
+
+        self.client = app.test_client()
+
+    def _revalidate(self, accept_encoding):
+        headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        first = self.client.get('/page', headers=headers)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+        second = self.client.get('/page', headers={**headers, 'If-None-Match': etag})
+        return first, second
+
+    def test_brotli_request_gets_304(self):
+        first, second = self._revalidate('gzip, deflate, br')
+        self.assertEqual(first.headers['Content-Encoding'], 'br')
+        self.assertTrue(first.headers['ETag'].endswith(':br"'))
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.data, b'')
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_gzip_request_gets_304(self):
+        first, second = self._revalidate('gzip')
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_uncompressed_request_gets_304(self):
+        first, second = self._revalidate(None)
+        self.assertNotIn('Content-Encoding', first.headers)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_changed_page_gets_200(self):
+        response = self.client.get('/page', headers={
+            'Accept-Encoding': 'gzip, deflate, br',
+            'If-None-Match': '"stale:br"',
+        })
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+test_question_answer.py
+-----------------------
+Description:
+    Checks that /question/answer formats the API's relevant theorems as the
+    positional rows Question_Page.js reads, and that a theorem missing a field
+    is still rendered (with 0 for weight/category) instead of failing the route.
+
+    The API client and the user log writer are patched out, so no API server
+    or database is needed; the app's own dependencies (incl. pyodbc) must be
+    installed.
+
+Run from the project root:
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from extensions import OrjsonProvider
+from pages.Question_Page import Question_Page
+
+
+class AnswerRouteTest(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.json = OrjsonProvider(app)
+        app.secret_key = 'test'
+        app.register_blueprint(Question_Page.question_page, url_prefix='/question')
+        self.client = app.test_client()
+
+        # Log entries are written after the request; don't touch the database
+        patcher = mock.patch.object(Question_Page.UserLogger, 'batch')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _answer(self, theorems):
+        result = {
+            'answer_result': {'relevant_theorems': theorems, 'updated_weights': {}},
+            'next_question': {'question_id': 2, 'question_text': 'שאלה'}
+        }
+        with mock.patch.object(Question_Page.api_client, 'submit_answer_and_next',
+                               return_value=result):
+            return self.client.post('/question/answer', json={'question_id': 1, 'answer': 'כן'})
+
+    def test_theorems_are_positional_rows(self):
+        response = self._answer([
+            {'theorem_id': 7, 'theorem_text': 'משפט', 'weight': 0.5,
+             'category': 1, 'combined_score': 0.9}
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['theorems'], [[7, 'משפט', 0.5, 1]])
+
+    def test_theorem_missing_fields_still_returns_200(self):
+        response = self._answer([{'theorem_id': 7, 'theorem_text': 'משפט'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['theorems'], [[7, 'משפט', 0, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()